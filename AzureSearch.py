@@ -1,9 +1,35 @@
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import SearchIndex, SimpleField, SearchFieldDataType, SearchableField
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import AioHttpTransport, RequestsTransport
+from azure.core.rest import HttpRequest
+from collections import OrderedDict
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
+from opentelemetry import trace
+from orjson_responses import install_orjson_json
+from requests.adapters import HTTPAdapter
+import aiohttp
+import argparse
+import asyncio
+import atexit
+import logging
+import orjson
 import os
+import queue
+import random
+import requests
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -20,11 +46,257 @@ if not all([Search_service_name, Search_api_key, endpoint]):
 # Create AzureKeyCredential object for authentication
 credential = AzureKeyCredential(Search_api_key)
 
+install_orjson_json()
+
+# Connection pool sizing and idle keep-alive (seconds) for search requests
+HTTP_POOL_SIZE = 64
+HTTP_KEEPALIVE_TIMEOUT = 300
+
+# Shared HTTP session so sync clients reuse pooled keep-alive connections
+# instead of paying a TLS handshake on every cold client
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+atexit.register(http_session.close)
+
+def create_sync_transport():
+    """
+    Create a transport backed by the shared HTTP session
+    
+    Returns:
+        RequestsTransport: Transport that leaves the shared session open when closed
+    """
+    return RequestsTransport(session=http_session, session_owner=False)
+
 # Initialize the index client with the credential
-index_client = SearchIndexClient(endpoint=endpoint, credential=credential)
+index_client = SearchIndexClient(endpoint=endpoint, credential=credential, transport=create_sync_transport())
+
+# Search REST API version used for raw document indexing requests
+SEARCH_API_VERSION = "2023-11-01"
+
+# Index field names, interned once and shared by the schema, queries and
+# result lookups
+ID = sys.intern("id")
+TITLE = sys.intern("title")
+CONTENT = sys.intern("content")
+CATEGORY = sys.intern("category")
+
+# Fields returned by search queries; everything else stays on the server
+RESULT_FIELDS = [ID, TITLE, CATEGORY, CONTENT]
+
+# Extracts the displayed fields of a result in one call; selected fields are
+# always present in results, with None for missing values
+display_fields = itemgetter(TITLE, CATEGORY, CONTENT)
+
+# Categories used by the sample documents; their filters are built once
+KNOWN_CATEGORIES = ("AI", "Azure", "Cloud", "Data", "IoT", "ML", "Tech", "Vision")
+
+# Per-document status codes that Azure Search reports as transient
+RETRYABLE_STATUS_CODES = {409, 422, 503}
+
+# Request-level status codes worth retrying, and the subset that signals throttling
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+THROTTLING_STATUS_CODES = {429, 503}
+
+def configure_logging(level=logging.INFO):
+    """
+    Route log records through a queue so console writes happen on a listener
+    thread instead of the thread issuing requests
+    
+    Args:
+        level (int, optional): Logging level for this module's logger
+    
+    Returns:
+        QueueListener: Started listener, stopped automatically at exit
+    """
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # Only this module's logger is configured; enabling INFO on the root logger
+    # would turn on azure-core's per-request HTTP logging
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def build_category_filter(category):
+    """
+    Build an OData filter matching a category, escaping embedded quotes
+    
+    Args:
+        category (str): Category to filter by
+    
+    Returns:
+        str: OData filter expression
+    """
+    escaped = category.replace("'", "''")
+    return f"{CATEGORY} eq '{escaped}'"
+
+def read_documents_jsonl(path):
+    """
+    Lazily read documents from a JSON Lines file, skipping malformed lines
+    
+    Args:
+        path (str): Path to a file with one JSON document per line
+    
+    Yields:
+        dict: Document
+    """
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.warning("Skipping malformed line %d in %s: %s", line_number, path, e)
+
+def configure_telemetry():
+    """
+    Export traces to Azure Monitor when an Application Insights connection
+    string is configured
+    """
+    if os.getenv('APPLICATIONINSIGHTS_CONNECTION_STRING'):
+        from azure.monitor.opentelemetry import configure_azure_monitor
+        configure_azure_monitor()
+
+@contextmanager
+def search_span(operation, attributes=None):
+    """
+    Trace an Azure Search call, recording the HTTP status of failed requests
+    
+    Args:
+        operation (str): Name of the search operation
+        attributes (dict, optional): Additional span attributes
+    
+    Yields:
+        Span: Active span
+    """
+    with tracer.start_as_current_span(f"azsearch.{operation}") as span:
+        span.set_attribute("db.system", "azure_search")
+        span.set_attribute("db.operation", operation)
+        for name, value in (attributes or {}).items():
+            span.set_attribute(name, value)
+        try:
+            yield span
+        except HttpResponseError as e:
+            if e.status_code is not None:
+                span.set_attribute("http.status_code", e.status_code)
+            raise
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after a fixed time
+    """
+    def __init__(self, maxsize, ttl):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize (int): Maximum number of entries kept
+            ttl (float): Lifetime of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Searches may run on worker threads while uploads clear the cache
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value for a key, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            inserted_at, value = entry
+            if time.monotonic() - inserted_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entry when full
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Async concurrency limiter that halves its limit when the service throttles
+    and grows it back by one after a window of clean requests (AIMD)
+    """
+    def __init__(self, max_limit, recovery_window=4):
+        """
+        Initialize the limiter
+        
+        Args:
+            max_limit (int): Maximum number of concurrent requests
+            recovery_window (int, optional): Clean requests needed before the limit grows
+        """
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.recovery_window = recovery_window
+        self._in_flight = 0
+        self._clean_streak = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def record_throttled(self):
+        """
+        Multiplicatively decrease the limit after a throttled request
+        """
+        self.limit = max(1, self.limit // 2)
+        self._clean_streak = 0
+
+    def record_success(self):
+        """
+        Additively increase the limit after a window of clean requests
+        """
+        self._clean_streak += 1
+        if self._clean_streak >= self.recovery_window and self.limit < self.max_limit:
+            self.limit += 1
+            self._clean_streak = 0
 
 class AzureCognitiveSearchManager:
-    def __init__(self, endpoint, credential, index_name):
+    # Index schema, built once and shared by every manager
+    INDEX_FIELDS = (
+        SimpleField(name=ID, type=SearchFieldDataType.String, key=True),
+        SearchableField(name=TITLE, type=SearchFieldDataType.String, retrievable=True, searchable=True),
+        SearchableField(name=CONTENT, type=SearchFieldDataType.String, retrievable=True, searchable=True),
+        SimpleField(name=CATEGORY, type=SearchFieldDataType.String, filterable=True, facetable=True)
+    )
+
+    def __init__(self, endpoint, credential, index_name, batch_size=1000,
+                 max_batch_bytes=1_000_000, max_in_flight=8, max_retries=5,
+                 retry_base_delay=0.5, throttle_alert_ratio=0.1, category_cache_ttl=60,
+                 keyword_cache_ttl=30):
         """
         Initialize the Azure Cognitive Search Manager
         
@@ -32,85 +304,538 @@ class AzureCognitiveSearchManager:
             endpoint (str): Azure Cognitive Search service endpoint
             credential (AzureKeyCredential): Authentication credential
             index_name (str): Name of the search index
+            batch_size (int, optional): Maximum number of documents per upload batch
+            max_batch_bytes (int, optional): Approximate maximum serialized size of an upload batch
+            max_in_flight (int, optional): Maximum number of concurrent upload batches
+            max_retries (int, optional): Maximum number of retries for throttled documents
+            retry_base_delay (float, optional): Base delay in seconds for exponential backoff
+            throttle_alert_ratio (float, optional): Throttled request ratio that triggers a warning
+            category_cache_ttl (float, optional): Seconds category search results stay cached
+            keyword_cache_ttl (float, optional): Seconds keyword search results stay cached
         """
         self.endpoint = endpoint
         self.credential = credential
         self.index_name = index_name
-        self.search_client = SearchClient(endpoint=endpoint, index_name=index_name, credential=credential)
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.throttle_alert_ratio = throttle_alert_ratio
+        self.search_client = SearchClient(
+            endpoint=endpoint,
+            index_name=index_name,
+            credential=credential,
+            transport=create_sync_transport()
+        )
+
+        # The async client is bound to an event loop, so the manager owns one
+        # for its lifetime and the client (and its connections) is reused
+        self._loop = asyncio.new_event_loop()
+        self._search_index = None
+        self._aiohttp_session = None
+        self._async_search_client = None
+
+        # Filters for known categories are built once so identical strings are
+        # sent on every query
+        self._category_filters = {category: build_category_filter(category) for category in KNOWN_CATEGORIES}
+
+        # Recent category search results, bounded so arbitrary input cannot grow it
+        self._category_cache = TTLCache(maxsize=128, ttl=category_cache_ttl)
+
+        # Recent keyword search results, keyed by (search term, top)
+        self._keyword_cache = TTLCache(maxsize=1024, ttl=keyword_cache_ttl)
+
+        # Upload throttling statistics
+        self._upload_requests = 0
+        self._throttled_requests = 0
+        self._throttle_alert = False
+
+        # Release connections on every exit path, including errors and Ctrl-C
+        atexit.register(self.close)
+
+    @property
+    def throttled_ratio(self):
+        """
+        Fraction of upload requests that were throttled by the service
+        
+        Returns:
+            float: Throttled request ratio
+        """
+        if not self._upload_requests:
+            return 0.0
+        return self._throttled_requests / self._upload_requests
+
+    def _record_upload_request(self, throttled):
+        """
+        Update throttling statistics and report when the ratio crosses the alert threshold
+        
+        Args:
+            throttled (bool): Whether the request was throttled
+        """
+        self._upload_requests += 1
+        if throttled:
+            self._throttled_requests += 1
+
+        alert = self.throttled_ratio >= self.throttle_alert_ratio
+        if alert != self._throttle_alert:
+            self._throttle_alert = alert
+            logger.warning(
+                "Throttled upload ratio %s %.0f%%: %.1f%%",
+                "rose above" if alert else "fell below",
+                self.throttle_alert_ratio * 100,
+                self.throttled_ratio * 100
+            )
+
+    async def _get_async_search_client(self):
+        """
+        Lazily open the async search client on the manager's event loop
+        
+        Returns:
+            AsyncSearchClient: Shared async search client
+        """
+        if self._async_search_client is None:
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT)
+            )
+            self._async_search_client = AsyncSearchClient(
+                endpoint=self.endpoint,
+                index_name=self.index_name,
+                credential=self.credential,
+                transport=AioHttpTransport(session=self._aiohttp_session, session_owner=False)
+            )
+            await self._async_search_client.__aenter__()
+        return self._async_search_client
+
+    def _run(self, coroutine):
+        """
+        Run a coroutine to completion on the manager's event loop
+        
+        Args:
+            coroutine (coroutine): Coroutine to run
+        
+        Returns:
+            object: Result of the coroutine
+        """
+        return self._loop.run_until_complete(coroutine)
+
+    def close(self):
+        """
+        Close the search clients and the manager's event loop; safe to call more than once
+        """
+        if self._loop.is_closed():
+            return
+        if self._async_search_client is not None:
+            self._run(self._async_search_client.close())
+            self._run(self._aiohttp_session.close())
+            self._async_search_client = None
+            self._aiohttp_session = None
+        self.search_client.close()
+        self._loop.close()
 
     def create_index(self):
         """
         Create the search index with predefined fields
         """
-        # Define the fields for the index
-        fields = [
-            SimpleField(name="id", type=SearchFieldDataType.String, key=True),
-            SearchableField(name="title", type=SearchFieldDataType.String, retrievable=True, searchable=True),
-            SearchableField(name="content", type=SearchFieldDataType.String, retrievable=True, searchable=True),
-            SimpleField(name="category", type=SearchFieldDataType.String, filterable=True, facetable=True)
-        ]
-        
-        # Create the index object
-        index = SearchIndex(
-            name=self.index_name,
-            fields=fields
-        )
+        # Create the index object once per manager
+        if self._search_index is None:
+            self._search_index = SearchIndex(
+                name=self.index_name,
+                fields=list(self.INDEX_FIELDS)
+            )
 
         # Create the index using the SearchIndexClient
         try:
-            index_client.create_index(index)
-            print(f"Index '{self.index_name}' created successfully.")
+            with search_span("create_index"):
+                index_client.create_index(self._search_index)
+            logger.info("Index '%s' created successfully.", self.index_name)
         except Exception as e:
-            print(f"Error creating index: {e}")
+            logger.error("Error creating index: %s", e)
+
+    def ensure_index(self, documents, reindex=False):
+        """
+        Create and populate the index only when it is missing or incomplete
+        
+        Args:
+            documents (list): Documents the index should contain
+            reindex (bool, optional): Drop and rebuild the index unconditionally
+        
+        Returns:
+            bool: False if the service could not be reached or rejected the request
+        """
+        existing = None
+        try:
+            if reindex:
+                try:
+                    with search_span("delete_index"):
+                        index_client.delete_index(self.index_name)
+                    logger.info("Index '%s' deleted for reindexing.", self.index_name)
+                except ResourceNotFoundError:
+                    pass
+            else:
+                try:
+                    with search_span("get_index"):
+                        index_client.get_index(self.index_name)
+                    with search_span("count"):
+                        existing = self.search_client.get_document_count()
+                except ResourceNotFoundError:
+                    pass
+        except (HttpResponseError, ServiceRequestError) as e:
+            logger.error("Error checking index '%s': %s", self.index_name, e)
+            return False
+
+        if existing is None:
+            self.create_index()
+            existing = 0
+
+        if existing < len(documents):
+            self.upload_documents(documents)
+        else:
+            logger.info("Index '%s' already holds %d documents; skipping upload.", self.index_name, existing)
+        return True
+
+    def _pack_batches(self, documents):
+        """
+        Serialize documents once and group them into batches bounded by
+        serialized size and count
+        
+        Args:
+            documents (list): List of documents to pack
+        
+        Yields:
+            list: Batch of (document key, serialized upload action) tuples
+        """
+        batch = []
+        current_size = 0
+        for document in documents:
+            try:
+                payload = orjson.dumps({**document, "@search.action": "upload"})
+                key = document[ID]
+            except KeyError:
+                logger.warning("Skipping document without an '%s' field", ID)
+                continue
+            except TypeError as e:
+                logger.warning("Skipping document that cannot be serialized: %s", e)
+                continue
+            if batch and (current_size + len(payload) > self.max_batch_bytes
+                          or len(batch) == self.batch_size):
+                yield batch
+                batch = []
+                current_size = 0
+            batch.append((key, payload))
+            current_size += len(payload)
+        if batch:
+            yield batch
+
+    async def _send_index_batch(self, client, batch):
+        """
+        Post pre-serialized upload actions directly to the index endpoint,
+        bypassing the SDK's per-document serialization
+        
+        Args:
+            client (AsyncSearchClient): Async search client
+            batch (list): Batch of (document key, serialized upload action) tuples
+        
+        Returns:
+            list: Indexing result dictionaries with 'key', 'status' and 'statusCode'
+        """
+        body = b'{"value":[' + b",".join(payload for _, payload in batch) + b"]}"
+        # Absolute URL, so the request does not depend on the generated client's base URL
+        request = HttpRequest(
+            "POST",
+            f"{self.endpoint.rstrip('/')}/indexes('{self.index_name}')/docs/search.index",
+            params={"api-version": SEARCH_API_VERSION},
+            headers={"Content-Type": "application/json"},
+            content=body
+        )
+        with search_span("upload", {"azsearch.batch_size": len(batch), "azsearch.batch_bytes": len(body)}) as span:
+            # send_request has already loaded the body (stream=False). SDK retries
+            # are disabled so throttling reaches _upload_batch's backoff and
+            # adaptive concurrency instead of being retried with the slot held
+            response = await client.send_request(request, retry_total=0)
+            span.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            results = orjson.loads(response.content)["value"]
+            span.set_attribute("azsearch.succeeded", sum(1 for result in results if result["status"]))
+        return results
+
+    async def _upload_batch(self, client, batch, limiter):
+        """
+        Upload a single batch, retrying transient failures and resubmitting
+        throttled documents with exponential backoff
+        
+        Args:
+            client (AsyncSearchClient): Async search client
+            batch (list): Batch of (document key, serialized upload action) tuples
+            limiter (AdaptiveConcurrencyLimiter): Limiter shared by concurrent batches
+        
+        Returns:
+            list: Final indexing result for each document in the batch
+        """
+        pending = batch
+        final_results = {}
+        for attempt in range(self.max_retries + 1):
+            throttled = False
+            try:
+                async with limiter:
+                    results = await self._send_index_batch(client, pending)
+            except (ServiceRequestError, ServiceResponseError):
+                if attempt == self.max_retries:
+                    raise
+                retry = True
+            except HttpResponseError as e:
+                if e.status_code not in TRANSIENT_STATUS_CODES or attempt == self.max_retries:
+                    raise
+                retry = True
+                throttled = e.status_code in THROTTLING_STATUS_CODES
+            else:
+                retry_keys = set()
+                for result in results:
+                    final_results[result["key"]] = result
+                    if not result["status"] and result["statusCode"] in RETRYABLE_STATUS_CODES:
+                        retry_keys.add(result["key"])
+                retry = throttled = bool(retry_keys)
+                pending = [item for item in pending if item[0] in retry_keys]
+
+            # Only throttling shrinks the concurrency limit; other transient
+            # failures back off without counting against the service's capacity
+            self._record_upload_request(throttled)
+            if throttled:
+                limiter.record_throttled()
+            elif not retry:
+                limiter.record_success()
+            if not retry or not pending or attempt == self.max_retries:
+                break
+            await asyncio.sleep(self.retry_base_delay * 2 ** attempt + random.uniform(0, self.retry_base_delay))
+
+        return list(final_results.values())
 
     def upload_documents(self, documents):
         """
         Upload documents to the search index
         
+        Args:
+            documents (list): List of documents to upload
+        """
+        self._run(self.upload_documents_async(documents))
+
+    async def upload_documents_async(self, documents):
+        """
+        Upload documents to the search index, keeping several batches in flight
+        
         Args:
             documents (list): List of documents to upload
         """
         if not documents:
-            print("No documents to upload.")
+            logger.info("No documents to upload.")
             return
 
         try:
-            # Split documents into batches (Azure Search allows batch size of up to 1000)
-            batch_size = 1000
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                results = self.search_client.upload_documents(documents=batch)
-                
-                # Handle upload results
-                for result in results:
-                    print(f"Document ID: {result['key']} - Upload status: {result['status']}")
-            
-            print("Documents uploaded successfully.")
-        
+            client = await self._get_async_search_client()
+            limiter = AdaptiveConcurrencyLimiter(self.max_in_flight)
+
+            # Split documents into batches by payload size (Azure Search allows up to
+            # 1000 documents and 16 MB per request)
+            outcomes = await asyncio.gather(
+                *(self._upload_batch(client, batch, limiter) for batch in self._pack_batches(documents)),
+                return_exceptions=True
+            )
         except Exception as e:
-            print(f"Error uploading documents: {e}")
+            logger.error("Error uploading documents: %s", e)
+            return
+
+        # Handle upload results
+        failed = False
+        for i, outcome in enumerate(outcomes):
+            failed = not self._report_batch(i, outcome) or failed
+
+        # Cached search results may no longer reflect the index
+        self._clear_search_caches()
+
+        if not failed:
+            logger.info("Documents uploaded successfully.")
+
+    def _report_batch(self, batch_number, outcome):
+        """
+        Log the outcome of an uploaded batch
+        
+        Args:
+            batch_number (int): Sequence number of the batch
+            outcome (list or Exception): Indexing results, or the error that aborted the batch
+        
+        Returns:
+            bool: True if every document in the batch was uploaded
+        """
+        if isinstance(outcome, Exception):
+            logger.error("Error uploading batch %d: %s", batch_number, outcome)
+            return False
+        succeeded = sum(1 for result in outcome if result["status"])
+        logger.info("Batch %d: %d/%d documents uploaded", batch_number, succeeded, len(outcome))
+        for result in outcome:
+            if result["status"]:
+                logger.debug("Document ID: %s - Upload status: %s", result["key"], result["status"])
+            else:
+                logger.warning("Document ID: %s - Upload failed: %s", result["key"], result.get("errorMessage"))
+        return succeeded == len(outcome)
 
-    def search_by_keyword(self, search_term):
+    async def ingest_stream(self, documents, workers=4, queue_size=32):
+        """
+        Upload a stream of documents through a bounded queue, so ingestion can
+        run alongside other coroutines on the manager's event loop
+        
+        Args:
+            documents (iterable): Documents to upload, consumed lazily
+            workers (int, optional): Number of concurrent upload workers
+            queue_size (int, optional): Maximum number of packed batches waiting for a worker
+        """
+        client = await self._get_async_search_client()
+        limiter = AdaptiveConcurrencyLimiter(self.max_in_flight)
+        batches = asyncio.Queue(maxsize=queue_size)
+
+        async def produce():
+            try:
+                for batch_number, batch in enumerate(self._pack_batches(documents)):
+                    await batches.put((batch_number, batch))
+            except Exception as e:
+                logger.error("Error reading document stream: %s", e)
+                return False
+            finally:
+                # Always release the workers, or they would wait on the queue forever
+                for _ in range(workers):
+                    await batches.put(None)
+            return True
+
+        async def consume():
+            while (item := await batches.get()) is not None:
+                batch_number, batch = item
+                try:
+                    outcome = await self._upload_batch(client, batch, limiter)
+                except Exception as e:
+                    outcome = e
+                self._report_batch(batch_number, outcome)
+                self._clear_search_caches()
+
+        stream_read, *_ = await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+        if stream_read:
+            logger.info("Document stream ingested.")
+
+    async def interactive_keyword_search(self):
+        """
+        Prompt for keywords and search until the user exits, without blocking
+        the event loop; queries use the sync client and its own connection pool
+        """
+        while True:
+            search_term = await asyncio.to_thread(input, "Enter keyword to search (or 'exit' to stop): ")
+            if search_term.lower() == 'exit':
+                break
+            await asyncio.to_thread(self.search_by_keyword, search_term)
+
+    def ingest_while_searching(self, documents):
+        """
+        Ingest a document stream in the background while serving keyword searches
+        
+        Args:
+            documents (iterable): Documents to upload, consumed lazily
+        """
+        async def run():
+            await asyncio.gather(self.ingest_stream(documents), self.interactive_keyword_search())
+
+        self._run(run())
+
+    async def search_many_async(self, queries, top=5):
+        """
+        Run keyword searches concurrently on the async client
+        
+        Args:
+            queries (list): Keywords to search for
+            top (int, optional): Maximum number of results per query
+        
+        Returns:
+            list: Search results for each query, or the error that query raised
+        """
+        client = await self._get_async_search_client()
+
+        async def search(query):
+            with search_span("search", {"azsearch.search_type": "batch"}) as span:
+                results = await client.search(query, select=RESULT_FIELDS, top=top)
+                search_results = [result async for result in results]
+                span.set_attribute("azsearch.result_count", len(search_results))
+            return search_results
+
+        return await asyncio.gather(*(search(query) for query in queries), return_exceptions=True)
+
+    def search_many(self, queries, top=5):
+        """
+        Run keyword searches concurrently
+        
+        Args:
+            queries (list): Keywords to search for
+            top (int, optional): Maximum number of results per query
+        
+        Returns:
+            list: Search results for each query, or the error that query raised
+        """
+        return self._run(self.search_many_async(queries, top))
+
+    def _category_filter(self, category):
+        """
+        Return the OData filter for a category
+        
+        Args:
+            category (str): Category to filter by
+        
+        Returns:
+            str: OData filter expression
+        """
+        return self._category_filters.get(category) or build_category_filter(category)
+
+    def _clear_search_caches(self):
+        """
+        Drop cached search results after the index contents change
+        """
+        self._category_cache.clear()
+        self._keyword_cache.clear()
+
+    def _search_raw(self, search_term, top):
+        """
+        Run a keyword search, serving repeated queries from the keyword cache
+        
+        Args:
+            search_term (str): Keyword to search for
+            top (int): Maximum number of results, or None for all
+        
+        Returns:
+            tuple: Search results
+        """
+        key = (search_term, top)
+        search_results = self._keyword_cache.get(key)
+        if search_results is None:
+            with search_span("search", {"azsearch.search_type": "keyword"}) as span:
+                results = self.search_client.search(search_term, select=RESULT_FIELDS, top=top)
+                search_results = tuple(results)
+                span.set_attribute("azsearch.result_count", len(search_results))
+            self._keyword_cache.set(key, search_results)
+        return search_results
+
+    def search_by_keyword(self, search_term, top=None):
         """
         Perform a basic keyword search across all searchable fields
         
         Args:
             search_term (str): Keyword to search for
+            top (int, optional): Maximum number of results to return
         
         Returns:
             list: Search results
         """
         try:
-            results = self.search_client.search(search_term)
-            search_results = list(results)
+            search_results = list(self._search_raw(search_term, top))
             
-            print(f"\n--- Keyword Search Results for '{search_term}' ---")
-            for result in search_results:
-                self._print_search_result(result)
+            self._print_search_results(f"\n--- Keyword Search Results for '{search_term}' ---", search_results)
             
             return search_results
         except Exception as e:
-            print(f"Error in keyword search: {e}")
+            logger.error("Error in keyword search: %s", e)
             return []
 
     def search_by_category(self, category):
@@ -124,16 +849,20 @@ class AzureCognitiveSearchManager:
             list: Search results matching the category
         """
         try:
-            results = self.search_client.search("*", filter=f"category eq '{category}'")
-            search_results = list(results)
+            search_results = self._category_cache.get(category)
+            if search_results is None:
+                with search_span("search", {"azsearch.search_type": "category"}) as span:
+                    results = self.search_client.search("*", filter=self._category_filter(category), select=RESULT_FIELDS)
+                    search_results = tuple(results)
+                    span.set_attribute("azsearch.result_count", len(search_results))
+                self._category_cache.set(category, search_results)
+            search_results = list(search_results)
             
-            print(f"\n--- Category Search Results for '{category}' ---")
-            for result in search_results:
-                self._print_search_result(result)
+            self._print_search_results(f"\n--- Category Search Results for '{category}' ---", search_results)
             
             return search_results
         except Exception as e:
-            print(f"Error in category search: {e}")
+            logger.error("Error in category search: %s", e)
             return []
 
     def advanced_search(self, search_term=None, category=None, minimum_results=1):
@@ -152,42 +881,53 @@ class AzureCognitiveSearchManager:
             # Construct filter condition
             filter_condition = None
             if category:
-                filter_condition = f"category eq '{category}'"
+                filter_condition = self._category_filter(category)
             
             # Perform search
-            results = self.search_client.search(
-                search_text=search_term or "*",
-                filter=filter_condition,
-                top=minimum_results  # Limit results
-            )
-            
-            search_results = list(results)
+            with search_span("search", {"azsearch.search_type": "advanced"}) as span:
+                results = self.search_client.search(
+                    search_text=search_term or "*",
+                    filter=filter_condition,
+                    select=RESULT_FIELDS,
+                    top=minimum_results  # Limit results
+                )
+                
+                search_results = list(results)
+                span.set_attribute("azsearch.result_count", len(search_results))
             
-            print(f"\n--- Advanced Search Results ---")
-            for result in search_results:
-                self._print_search_result(result)
+            self._print_search_results(f"\n--- Advanced Search Results ---", search_results)
             
             return search_results
         except Exception as e:
-            print(f"Error in advanced search: {e}")
+            logger.error("Error in advanced search: %s", e)
             return []
 
-    def _print_search_result(self, result):
+    def _print_search_results(self, heading, search_results):
         """
-        Helper method to print search result details
+        Helper method to print search results with a single write
         
         Args:
-            result (dict): Search result to print
+            heading (str): Heading printed above the results
+            search_results (list): Search results to print
         """
-        print(f"Title: {result.get('title')}")
-        print(f"Category: {result.get('category')}")
-        print(f"Content: {result.get('content')[:200]}...")  # Truncate long content
-        print("---")
+        lines = [heading]
+        for result in search_results:
+            title, category, content = display_fields(result)
+            lines.append(f"Title: {title}")
+            lines.append(f"Category: {category}")
+            lines.append(f"Content: {(content or '')[:200]}...")  # Truncate long content
+            lines.append("---")
+        print("\n".join(lines))
 
 def main():
     """
     Main function to demonstrate Azure Cognitive Search functionality
     """
+    parser = argparse.ArgumentParser(description="Azure Cognitive Search demo")
+    parser.add_argument("--reindex", action="store_true", help="drop and rebuild the index before searching")
+    parser.add_argument("--ingest", metavar="PATH", help="upload documents from a JSON Lines file while serving keyword searches")
+    args = parser.parse_args()
+
     # Define your index name
     index_name = "kirangajjana"
 
@@ -210,51 +950,75 @@ def main():
   {"id": "15", "title": "Edge Computing", "content": "Edge computing processes data closer to the source for faster insights.", "category": "Cloud"},
     ]
     
+    configure_logging()
+    configure_telemetry()
+
     # Create search manager
     search_manager = AzureCognitiveSearchManager(endpoint, credential, index_name)
     
-    # Create index and upload documents
-    search_manager.create_index()
-    search_manager.upload_documents(sample_documents)
-
-    # Search menu
-    while True:
-        print("\n--- Azure Cognitive Search Menu ---")
-        print("1. Keyword Search")
-        print("2. Category Search")
-        print("3. Advanced Search")
-        print("4. Exit")
-        
-        choice = input("Enter your choice (1-4): ")
-        
-        if choice == '1':
-            # Keyword Search
-            search_term = input("Enter keyword to search: ")
-            search_manager.search_by_keyword(search_term)
-        
-        elif choice == '2':
-            # Category Search
-            category = input("Enter category to search (AI, Azure, Cloud, etc.): ")
-            search_manager.search_by_category(category)
-        
-        elif choice == '3':
-            # Advanced Search
-            print("\nAdvanced Search Options:")
-            search_term = input("Enter keyword (optional, press enter to skip): ")
-            category = input("Enter category (optional, press enter to skip): ")
-            min_results = input("Minimum number of results (default is 1): ")
+    try:
+        # Create index and upload documents unless they are already in place
+        if not search_manager.ensure_index(sample_documents, reindex=args.reindex):
+            return
+
+        # Stream additional documents in while keyword searches are served
+        if args.ingest:
+            search_manager.ingest_while_searching(read_documents_jsonl(args.ingest))
+            return
+
+        # Queries piped on stdin run concurrently, one JSON line per query on stdout
+        if not sys.stdin.isatty():
+            queries = [line.strip() for line in sys.stdin if line.strip()]
+            for query, outcome in zip(queries, search_manager.search_many(queries)):
+                record = {"query": query}
+                if isinstance(outcome, Exception):
+                    record["error"] = str(outcome)
+                else:
+                    record["results"] = outcome
+                sys.stdout.buffer.write(orjson.dumps(record) + b"\n")
+            sys.stdout.flush()
+            return
+
+        # Search menu
+        while True:
+            print("\n--- Azure Cognitive Search Menu ---")
+            print("1. Keyword Search")
+            print("2. Category Search")
+            print("3. Advanced Search")
+            print("4. Exit")
+        
+            choice = input("Enter your choice (1-4): ")
+        
+            if choice == '1':
+                # Keyword Search
+                search_term = input("Enter keyword to search: ")
+                search_manager.search_by_keyword(search_term)
+        
+            elif choice == '2':
+                # Category Search
+                category = input("Enter category to search (AI, Azure, Cloud, etc.): ")
+                search_manager.search_by_category(category)
+        
+            elif choice == '3':
+                # Advanced Search
+                print("\nAdvanced Search Options:")
+                search_term = input("Enter keyword (optional, press enter to skip): ")
+                category = input("Enter category (optional, press enter to skip): ")
+                min_results = input("Minimum number of results (default is 1): ")
             
-            # Convert minimum results to integer, default to 1 if not provided
-            min_results = int(min_results) if min_results.isdigit() else 1
+                # Convert minimum results to integer, default to 1 if not provided
+                min_results = int(min_results) if min_results.isdigit() else 1
             
-            search_manager.advanced_search(search_term, category, min_results)
+                search_manager.advanced_search(search_term, category, min_results)
         
-        elif choice == '4':
-            print("Exiting Azure Cognitive Search...")
-            break
+            elif choice == '4':
+                print("Exiting Azure Cognitive Search...")
+                break
         
-        else:
-            print("Invalid choice. Please try again.")
+            else:
+                print("Invalid choice. Please try again.")
+    finally:
+        search_manager.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
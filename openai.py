@@ -1,8 +1,162 @@
 import os
+import sys
+import asyncio
+import atexit
+import hashlib
+import uuid
+from array import array
+from operator import itemgetter
+from opentelemetry import trace
+from orjson_responses import install_orjson_json
 from dotenv import load_dotenv
-from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI  # Assuming you'll use Azure OpenAI Python library
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import AioHttpTransport
+import aiohttp
+import orjson
+import tiktoken
+from openai import AzureOpenAI, AsyncAzureOpenAI  # Assuming you'll use Azure OpenAI Python library
+
+install_orjson_json()
+
+tracer = trace.get_tracer(__name__)
+SEARCH_SPAN_ATTRIBUTES = {"db.system": "azure_search", "db.operation": "search"}
+
+# Sent byte-identical on every request so the service can reuse its prompt
+# prefix cache; never interpolate values into it
+SYSTEM_PROMPT = "You are a helpful AI assistant that answers questions based on provided context."
+
+FALLBACK_RESPONSE = "I'm unable to generate a response at the moment."
+
+# Connection pool sizing and idle keep-alive (seconds) for search requests
+HTTP_POOL_SIZE = 64
+HTTP_KEEPALIVE_TIMEOUT = 300
+
+# Fields returned by search queries, and the subset used to build RAG context
+SEARCH_FIELDS = ["id", "title", "category", "content"]
+CONTEXT_FIELDS = ["title", "content"]
+context_fields = itemgetter(*CONTEXT_FIELDS)
+
+def configure_telemetry():
+    """
+    Export traces to Azure Monitor when an Application Insights connection
+    string is configured
+    """
+    if os.getenv('APPLICATIONINSIGHTS_CONNECTION_STRING'):
+        from azure.monitor.opentelemetry import configure_azure_monitor
+        configure_azure_monitor()
+
+class SemanticResponseCache:
+    """
+    Two-tier Redis cache for RAG responses: an exact match on the query text,
+    then a nearest-neighbour match on the query embedding
+    """
+    def __init__(self, redis_client, embed, similarity_threshold=0.95, ttl=3600, index_name="qcache"):
+        """
+        Initialize the response cache
+        
+        Args:
+            redis_client (redis.Redis): Redis client with the search module available
+            embed (callable): Function returning the embedding (list of floats) of a query
+            similarity_threshold (float): Minimum cosine similarity for a semantic hit
+            ttl (int): Lifetime of cached entries in seconds
+            index_name (str): Name of the Redis vector index and key prefix
+        """
+        self.redis = redis_client
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.index_name = index_name
+        self._index_ready = False
+        self._last_embedding = (None, None)
+
+    def _exact_key(self, query):
+        return f"{self.index_name}:exact:{hashlib.sha256(query.encode()).hexdigest()}"
+
+    def _embedding(self, query):
+        """
+        Embed a query, reusing the embedding computed by the preceding lookup
+        """
+        last_query, last_embedding = self._last_embedding
+        if last_query != query:
+            last_embedding = array("f", self.embed(query)).tobytes()
+            self._last_embedding = (query, last_embedding)
+        return last_embedding
+
+    def _ensure_index(self, dimensions):
+        """
+        Create the HNSW vector index on first use
+        """
+        if self._index_ready:
+            return
+        from redis import ResponseError
+        try:
+            self.redis.ft(self.index_name).info()
+        except ResponseError:
+            self.redis.execute_command(
+                "FT.CREATE", self.index_name, "ON", "HASH",
+                "PREFIX", "1", f"{self.index_name}:vec:",
+                "SCHEMA", "vec", "VECTOR", "HNSW", "6",
+                "TYPE", "FLOAT32", "DIM", dimensions, "DISTANCE_METRIC", "COSINE"
+            )
+        self._index_ready = True
+
+    def get(self, query):
+        """
+        Look up a cached response for the query or a semantically similar one
+        
+        Args:
+            query (str): User's search query
+        
+        Returns:
+            tuple: (search_results, generated_response), or None on a miss
+        """
+        try:
+            payload = self.redis.get(self._exact_key(query))
+            if payload is None:
+                from redis.commands.search.query import Query
+                embedding = self._embedding(query)
+                self._ensure_index(len(embedding) // 4)
+                knn = (
+                    Query("*=>[KNN 1 @vec $q AS score]")
+                    .sort_by("score")
+                    .return_fields("score", "payload")
+                    .dialect(2)
+                )
+                docs = self.redis.ft(self.index_name).search(knn, query_params={"q": embedding}).docs
+                # Cosine distance is 1 - similarity
+                if docs and 1 - float(docs[0].score) >= self.similarity_threshold:
+                    payload = docs[0].payload
+            if payload is None:
+                return None
+            cached = orjson.loads(payload)
+            return cached["results"], cached["response"]
+        except Exception as e:
+            print(f"Response cache error: {e}", file=sys.stderr)
+            return None
+
+    def put(self, query, search_results, generated_response):
+        """
+        Store a response under both the exact query and its embedding
+        
+        Args:
+            query (str): User's search query
+            search_results (list): Relevant documents from search
+            generated_response (str): Generated response
+        """
+        payload = orjson.dumps({"results": search_results, "response": generated_response})
+        try:
+            embedding = self._embedding(query)
+            self._ensure_index(len(embedding) // 4)
+            vector_key = f"{self.index_name}:vec:{uuid.uuid4().hex}"
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(self._exact_key(query), payload, ex=self.ttl)
+            pipe.hset(vector_key, mapping={"vec": embedding, "payload": payload})
+            pipe.expire(vector_key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Response cache error: {e}", file=sys.stderr)
 
 class RAGSearchSystem:
     def __init__(self):
@@ -21,60 +175,209 @@ class RAGSearchSystem:
         
         # Initialize clients
         self.search_credential = AzureKeyCredential(self.search_key)
-        self.search_client = SearchClient(
-            endpoint=self.search_endpoint, 
-            index_name=self.search_index_name, 
-            credential=self.search_credential
-        )
-        
+
+        # The sync OpenAI client is used only for query embeddings, which the
+        # response cache computes on a worker thread
+        self.openai_api_version = "2023-12-01-preview"  # Use the latest API version
         self.openai_client = AzureOpenAI(
             azure_endpoint=self.openai_endpoint,
             api_key=self.openai_key,
-            api_version="2023-12-01-preview"  # Use the latest API version
+            api_version=self.openai_api_version
+        )
+
+        # Async clients are bound to an event loop, so the system owns one and
+        # opens the clients on it lazily; their connections persist across queries
+        self._loop = asyncio.new_event_loop()
+        self._aiohttp_session = None
+        self.async_search_client = None
+        self.async_openai_client = None
+        self._warm_up_task = None
+        self.warm_prompt_prefix = True
+
+        # Stable caller id so the service can route repeat requests to a warm prefix cache
+        self.session_id = str(uuid.uuid4())
+
+        # Token budget for each document's content in the RAG context
+        self.max_context_tokens_per_doc = 500
+        self._encoding = self._load_encoding()
+
+        # Optional Redis response cache for repeated and near-duplicate queries
+        self.embedding_deployment_name = os.getenv('AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME', 'text-embedding-3-small')
+        redis_url = os.getenv('REDIS_URL')
+        self.response_cache = None
+        if redis_url:
+            import redis
+            self.response_cache = SemanticResponseCache(redis.Redis.from_url(redis_url), self.embed_query)
+
+        # Release connections on every exit path, including errors and Ctrl-C
+        atexit.register(self.close)
+
+    async def _open_async_clients(self):
+        """
+        Lazily open the async search and OpenAI clients on the system's event loop
+        """
+        if self.async_search_client is None:
+            # Pooled keep-alive session so repeated queries skip the TLS handshake
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT)
+            )
+            self.async_search_client = AsyncSearchClient(
+                endpoint=self.search_endpoint,
+                index_name=self.search_index_name,
+                credential=self.search_credential,
+                transport=AioHttpTransport(session=self._aiohttp_session, session_owner=False)
+            )
+            await self.async_search_client.__aenter__()
+        if self.async_openai_client is None:
+            self.async_openai_client = AsyncAzureOpenAI(
+                azure_endpoint=self.openai_endpoint,
+                api_key=self.openai_key,
+                api_version=self.openai_api_version
+            )
+            # Warm the completion connection once, overlapping the first search
+            if self.warm_prompt_prefix:
+                self._warm_up_task = asyncio.create_task(self._warm_up_completion())
+
+    def close(self):
+        """
+        Close all clients and the system's event loop; safe to call more than once
+        """
+        if self._loop.is_closed():
+            return
+        if self._warm_up_task is not None:
+            self._loop.run_until_complete(self._warm_up_task)
+        if self.async_search_client is not None:
+            self._loop.run_until_complete(self.async_search_client.close())
+            self._loop.run_until_complete(self._aiohttp_session.close())
+        if self.async_openai_client is not None:
+            self._loop.run_until_complete(self.async_openai_client.close())
+        self._loop.close()
+        self.openai_client.close()
+
+    def embed_query(self, query):
+        """
+        Compute the embedding of a query
+        
+        Args:
+            query (str): User's search query
+        
+        Returns:
+            list: Query embedding
+        """
+        response = self.openai_client.embeddings.create(
+            model=self.embedding_deployment_name,
+            input=query
         )
+        return response.data[0].embedding
 
-    def semantic_search(self, query, top_k=5):
+    async def semantic_search_async(self, query, top_k=5, select=SEARCH_FIELDS):
         """
-        Perform semantic search and retrieve most relevant documents
+        Perform semantic search with the async search client
         
         Args:
             query (str): User's search query
             top_k (int): Number of top results to retrieve
+            select (list): Fields to return for each result
         
         Returns:
             list: Relevant search results
         """
         try:
-            search_results = self.search_client.search(
-                search_text=query,
-                top=top_k
-            )
-            return list(search_results)
+            with tracer.start_as_current_span("azsearch.search", attributes=SEARCH_SPAN_ATTRIBUTES) as span:
+                try:
+                    results = await self.async_search_client.search(
+                        search_text=query,
+                        select=select,
+                        top=top_k
+                    )
+                    search_results = [result async for result in results]
+                except HttpResponseError as e:
+                    if e.status_code is not None:
+                        span.set_attribute("http.status_code", e.status_code)
+                    raise
+                span.set_attribute("azsearch.result_count", len(search_results))
+            return search_results
         
         except Exception as e:
-            print(f"Search error: {e}")
+            print(f"Search error: {e}", file=sys.stderr)
             return []
 
-    def generate_response(self, query, search_results):
+    async def _warm_up_completion(self):
+        """
+        Send a one-token completion with the system prompt so the connection
+        to the deployment is open when the first real request is sent
+        """
+        try:
+            stream = await self.async_openai_client.chat.completions.create(
+                model=self.openai_deployment_name,
+                user=self.session_id,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT}
+                ],
+                max_tokens=1,
+                stream=True
+            )
+            await stream.close()
+        except Exception:
+            # Warm-up is best effort; the real request reports any errors
+            pass
+
+    def _load_encoding(self):
+        """
+        Resolve the tokenizer for the deployment once, at startup
+        
+        Returns:
+            Encoding: tiktoken encoding, or None if it cannot be loaded
+        """
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.openai_deployment_name)
+            except KeyError:
+                # Azure deployment names need not match a model name
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # The BPE file is downloaded on first use and may be unavailable offline
+            print(f"Tokenizer unavailable, truncating context by characters: {e}", file=sys.stderr)
+            return None
+
+    def _truncate_to_token_budget(self, text):
         """
-        Use OpenAI to generate a contextual response based on search results
+        Trim text to the per-document context token budget
+        
+        Args:
+            text (str): Document content
+        
+        Returns:
+            str: Content that fits the token budget
+        """
+        if self._encoding is None:
+            # Roughly four characters per token for English text
+            return text[:self.max_context_tokens_per_doc * 4]
+        tokens = self._encoding.encode(text)
+        if len(tokens) <= self.max_context_tokens_per_doc:
+            return text
+        return self._encoding.decode(tokens[:self.max_context_tokens_per_doc])
+
+    def _build_messages(self, query, search_results):
+        """
+        Build the chat messages for a query and its search results
         
         Args:
             query (str): Original user query
             search_results (list): Relevant documents from search
         
         Returns:
-            str: Generated response
+            list: Chat completion messages
         """
-        # Construct context from search results
-        context = "\n\n".join([
-            f"Title: {result.get('title', '')}\nContent: {result.get('content', '')}" 
-            for result in search_results
-        ])
+        # Construct a compact JSON context from search results
+        context = orjson.dumps([
+            {"t": title or '', "c": self._truncate_to_token_budget(content or '')}
+            for title, content in map(context_fields, search_results)
+        ]).decode()
 
         # Prepare prompt for OpenAI
         prompt = f"""
-        Context: {context}
+        Context (JSON list of documents, "t" is the title and "c" the content): {context}
         
         Query: {query}
         
@@ -82,21 +385,84 @@ class RAGSearchSystem:
         If the context doesn't contain sufficient information, acknowledge that transparently.
         """
 
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    async def generate_response_async(self, query, search_results):
+        """
+        Use the async OpenAI client to generate a contextual response,
+        yielding tokens as they arrive
+        
+        Args:
+            query (str): Original user query
+            search_results (list): Relevant documents from search
+        
+        Yields:
+            str: Generated response tokens
+        """
         try:
-            response = self.openai_client.chat.completions.create(
+            response = await self.async_openai_client.chat.completions.create(
                 model=self.openai_deployment_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant that answers questions based on provided context."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300  # Adjust as needed
+                user=self.session_id,
+                messages=self._build_messages(query, search_results),
+                max_tokens=300,  # Adjust as needed
+                stream=True
             )
             
-            return response.choices[0].message.content
+            async for chunk in response:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
         
         except Exception as e:
-            print(f"OpenAI generation error: {e}")
-            return "I'm unable to generate a response at the moment."
+            print(f"OpenAI generation error: {e}", file=sys.stderr)
+            yield FALLBACK_RESPONSE
+
+    async def _replay_response(self, generated_response):
+        """
+        Yield a cached response as a single token
+        """
+        yield generated_response
+
+    async def _stream_and_cache(self, query, search_results, tokens):
+        """
+        Pass tokens through to the caller and cache the full response once
+        the stream completes
+        
+        Args:
+            query (str): Original user query
+            search_results (list): Relevant documents from search
+            tokens (async generator): Generated response tokens
+        
+        Yields:
+            str: Generated response tokens
+        """
+        chunks = []
+        async for token in tokens:
+            chunks.append(token)
+            yield token
+
+        # Answers built without context (no hits, or a failed search that returned
+        # nothing) are not worth serving again for an hour
+        if self.response_cache and search_results and chunks and chunks[-1] != FALLBACK_RESPONSE:
+            await asyncio.to_thread(self.response_cache.put, query, search_results, "".join(chunks))
+
+    def _iterate_on_loop(self, tokens):
+        """
+        Drive an async token generator from synchronous code on the system's event loop
+        
+        Args:
+            tokens (async generator): Generated response tokens
+        
+        Yields:
+            str: Generated response tokens
+        """
+        while True:
+            try:
+                yield self._loop.run_until_complete(tokens.__anext__())
+            except StopAsyncIteration:
+                return
 
     def rag_search(self, query):
         """
@@ -106,34 +472,107 @@ class RAGSearchSystem:
             query (str): User's search query
         
         Returns:
-            tuple: (search_results, generated_response)
+            tuple: (search_results, iterator of generated response tokens)
         """
+        search_results, tokens = self._loop.run_until_complete(self.rag_search_async(query))
+        return search_results, self._iterate_on_loop(tokens)
+
+    async def rag_search_async(self, query):
+        """
+        Complete RAG workflow on the async clients
+        
+        Args:
+            query (str): User's search query
+        
+        Returns:
+            tuple: (search_results, async generator of generated response tokens)
+        """
+        # Serve repeated and near-duplicate queries from the cache
+        if self.response_cache:
+            cached = await asyncio.to_thread(self.response_cache.get, query)
+            if cached:
+                search_results, generated_response = cached
+                return search_results, self._replay_response(generated_response)
+
+        await self._open_async_clients()
+
         # Semantic search first
-        search_results = self.semantic_search(query)
+        search_results = await self.semantic_search_async(query, select=CONTEXT_FIELDS)
+        
+        # Stream the response generated from the search results
+        tokens = self.generate_response_async(query, search_results)
+        return search_results, self._stream_and_cache(query, search_results, tokens)
+
+    async def rag_search_many_async(self, queries):
+        """
+        Run the RAG workflow for several queries concurrently
+        
+        Args:
+            queries (list): User search queries
+        
+        Returns:
+            list: (search_results, generated_response) for each query, or the
+            error that query raised
+        """
+        await self._open_async_clients()
+
+        async def answer(query):
+            search_results, tokens = await self.rag_search_async(query)
+            return search_results, "".join([token async for token in tokens])
+
+        return await asyncio.gather(*(answer(query) for query in queries), return_exceptions=True)
+
+    def rag_search_many(self, queries):
+        """
+        Run the RAG workflow for several queries concurrently
         
-        # Generate response using search results
-        generated_response = self.generate_response(query, search_results)
+        Args:
+            queries (list): User search queries
         
-        return search_results, generated_response
+        Returns:
+            list: (search_results, generated_response) for each query, or the
+            error that query raised
+        """
+        return self._loop.run_until_complete(self.rag_search_many_async(queries))
 
 def main():
+    configure_telemetry()
+
     rag_system = RAGSearchSystem()
+
+    # Queries piped on stdin run concurrently, one JSON line per query on stdout
+    if not sys.stdin.isatty():
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+        for query, outcome in zip(queries, rag_system.rag_search_many(queries)):
+            record = {"query": query}
+            if isinstance(outcome, Exception):
+                record["error"] = str(outcome)
+            else:
+                record["results"], record["response"] = outcome
+            sys.stdout.buffer.write(orjson.dumps(record) + b"\n")
+        sys.stdout.flush()
+        rag_system.close()
+        return
     
     while True:
         query = input("Enter your search query (or 'exit' to quit): ")
         
         if query.lower() == 'exit':
+            rag_system.close()
             break
         
         search_results, response = rag_system.rag_search(query)
         
         print("\n--- Search Results ---")
-        for result in search_results:
-            print(f"Title: {result.get('title')}")
-            print(f"Content: {result.get('content')[:200]}...\n")
+        for title, content in map(context_fields, search_results):
+            print(f"Title: {title}")
+            print(f"Content: {(content or '')[:200]}...\n")
         
         print("\n--- Generated Response ---")
-        print(response)
+        for token in response:
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        print()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
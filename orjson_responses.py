@@ -0,0 +1,26 @@
+from azure.core.rest._http_response_impl import _HttpResponseBaseImpl
+import orjson
+
+def install_orjson_json():
+    """
+    Parse JSON response bodies with orjson instead of the stdlib json module.
+    The search SDK builds results from HttpResponse.json(), so this is the
+    parse on the query hot path. Bodies orjson rejects (for example non-UTF-8
+    charsets or a BOM) fall back to the original implementation.
+    """
+    original_json = _HttpResponseBaseImpl.json
+    if getattr(original_json, "_uses_orjson", False):
+        return
+
+    def json(self):
+        # Accessing content raises ResponseNotReadError if the body is not loaded
+        content = self.content
+        if not self._json:
+            try:
+                self._json = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                return original_json(self)
+        return self._json
+
+    json._uses_orjson = True
+    _HttpResponseBaseImpl.json = json